@@ -1,11 +1,18 @@
+import hashlib
+import os
+import tempfile
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
+import pyarrow as pa
+import pyarrow.compute as pc
 from io import BytesIO
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from pandas.io.common import dedup_names
+from python_calamine import CalamineWorkbook
+from tsdownsample import LTTBDownsampler
 
 # ========== PAGE CONFIGURATION ==========
 st.set_page_config(
@@ -16,104 +23,13 @@ st.set_page_config(
 )
 
 # ========== CUSTOM THEME ==========
+@st.cache_resource
+def _load_theme_css():
+    """Read the dark theme stylesheet once per process"""
+    return (Path(__file__).parent / "static" / "theme.css").read_text(encoding="utf-8")
+
 def apply_custom_theme():
-    st.markdown("""
-    <style>
-        /* Main container */
-        [data-testid="stAppViewContainer"] {
-            background-color: #0e1117;
-            color: #ffffff;
-        }
-        
-        /* Text elements */
-        h1, h2, h3, h4, h5, h6, p, div, .stMarkdown {
-            color: #ffffff !important;
-        }
-        
-        /* Sidebar */
-        [data-testid="stSidebar"] {
-            background-color: #1a1d24 !important;
-            border-right: 1px solid #2a2f3b !important;
-        }
-        
-        /* Cards */
-        .card {
-            background-color: #1e2229 !important;
-            border-radius: 10px;
-            padding: 20px;
-            box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
-            margin-bottom: 20px;
-            border: 1px solid #2a2f3b;
-        }
-        
-        /* Input fields */
-        .stTextInput, .stSelectbox, .stTextArea, .stNumberInput {
-            background-color: #1e2229 !important;
-            color: white !important;
-            border: 1px solid #2a2f3b !important;
-        }
-        
-        /* File uploader */
-        .stFileUploader > div > div {
-            background-color: #1e2229 !important;
-            border: 2px dashed #4b6cb7 !important;
-            color: white !important;
-        }
-        
-        /* Buttons */
-        .stButton > button {
-            background-color: #4b6cb7 !important;
-            color: white !important;
-            border: none !important;
-            transition: all 0.3s ease;
-        }
-        .stButton > button:hover {
-            background-color: #3a5a9b !important;
-            transform: scale(1.02);
-        }
-        
-        /* Dataframes */
-        .stDataFrame {
-            background-color: #1e2229 !important;
-            color: white !important;
-        }
-        
-        /* Expanders */
-        .stExpander {
-            background-color: #1e2229 !important;
-            border: 1px solid #2a2f3b !important;
-        }
-        .stExpander > div > div {
-            background-color: #1e2229 !important;
-        }
-        
-        /* Footer */
-        .footer {
-            background-color: #1a1d24 !important;
-            color: white !important;
-            padding: 15px;
-            text-align: center;
-            border-top: 1px solid #2a2f3b;
-            font-size: 0.9rem;
-        }
-        
-        /* Plotly chart background */
-        .js-plotly-plot .plotly {
-            background-color: #1e2229 !important;
-        }
-        
-        /* Tooltips */
-        .stTooltip {
-            background-color: #2a2f3b !important;
-            color: white !important;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Apply dark theme to matplotlib and seaborn
-    plt.style.use('dark_background')
-    sns.set_style("darkgrid")
-    sns.set_palette("muted")
+    st.markdown(f"<style>{_load_theme_css()}</style>", unsafe_allow_html=True)
 
 apply_custom_theme()
 
@@ -153,18 +69,244 @@ def create_sidebar():
         return user_name, uploaded_file
 
 # ========== DATA PROCESSING FUNCTIONS ==========
+LARGE_FILE_BYTES = 100 * 1024 * 1024
+CSV_CHUNK_ROWS = 100_000
+EXCEL_CHUNK_ROWS = 50_000
+PARQUET_CACHE_DIR = Path(tempfile.gettempdir()) / "growth_mindset_analyzer"
+PARQUET_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+
+def _read_csv(payload):
+    """Parse CSV bytes with the pyarrow engine, falling back to the default parser"""
+    # Frames stay numpy-backed: Plotly cannot serialize or test the pd.NA
+    # values that arrow-backed text and bool columns carry
+    try:
+        return pd.read_csv(BytesIO(payload), engine='pyarrow')
+    except Exception:
+        if len(payload) > LARGE_FILE_BYTES:
+            chunks = pd.read_csv(BytesIO(payload), chunksize=CSV_CHUNK_ROWS)
+            return pd.concat(chunks, ignore_index=True)
+        return pd.read_csv(BytesIO(payload))
+
+def _excel_cell(value):
+    """Normalize a calamine cell the way pandas' calamine reader does"""
+    if value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, date):
+        return pd.Timestamp(value)
+    if isinstance(value, timedelta):
+        return pd.Timedelta(value)
+    return value
+
+def _excel_header(row):
+    """Name blank header cells and de-duplicate repeats with pandas' own rule"""
+    names = [
+        f"Unnamed: {i}" if name is None else name
+        for i, name in enumerate(_excel_cell(cell) for cell in row)
+    ]
+    return list(dedup_names(names, is_potential_multiindex=False))
+
+def _excel_chunk(rows, header):
+    """Build an object frame from a block of sheet rows"""
+    return pd.DataFrame(
+        [[_excel_cell(cell) for cell in row] for row in rows],
+        columns=header,
+        dtype=object
+    )
+
+def _read_excel_chunked(payload):
+    """Read the first sheet in row blocks, reporting progress as it goes"""
+    sheet = CalamineWorkbook.from_filelike(BytesIO(payload)).get_sheet_by_index(0)
+    rows = sheet.iter_rows()
+    header = _excel_header(next(rows, []))
+    
+    total = max(sheet.height - 1, 1)
+    progress = st.progress(0.0, text="Reading Excel rows...")
+    chunks, block, done = [], [], 0
+    for row in rows:
+        block.append(row)
+        if len(block) == EXCEL_CHUNK_ROWS:
+            chunks.append(_excel_chunk(block, header))
+            done += len(block)
+            block = []
+            progress.progress(min(done / total, 1.0), text="Reading Excel rows...")
+    if block or not chunks:
+        chunks.append(_excel_chunk(block, header))
+    progress.empty()
+    
+    # Infer dtypes once over all rows so a block that is blank in some
+    # column cannot pin that column to a null type
+    return pd.concat(chunks, ignore_index=True).infer_objects()
+
+def _downcast(df, category_ratio=0.5):
+    """Shrink numeric columns to the smallest lossless type and repeated strings to category"""
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_float_dtype(series):
+            # to_numeric only checks closeness, so keep float32 only on an exact round-trip
+            narrowed = pd.to_numeric(series, downcast='float')
+            if narrowed.astype(series.dtype).equals(series):
+                df[col] = narrowed
+        elif pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif series.dtype == object or pd.api.types.is_string_dtype(series):
+            if len(series) and series.nunique() / len(series) < category_ratio:
+                df[col] = series.astype('category')
+    return df
+
+def _parquet_cache_path(payload):
+    """Scratch parquet location keyed on the uploaded file contents"""
+    digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    return PARQUET_CACHE_DIR / f'gm_{digest}.parquet'
+
+def _dtype_signature(df):
+    """Column names and dtypes, including categorical category dtypes"""
+    return [
+        (col, str(dtype), str(dtype.categories.dtype) if isinstance(dtype, pd.CategoricalDtype) else None)
+        for col, dtype in df.dtypes.items()
+    ]
+
+def _read_parquet_cache(path):
+    """Load a cached frame and mark it recently used"""
+    df = pd.read_parquet(path, engine='pyarrow')
+    os.utime(path)
+    return df
+
+def _evict_parquet_cache(keep):
+    """Delete least recently used cache files until the directory fits the cap"""
+    entries = []
+    for path in PARQUET_CACHE_DIR.glob('gm_*.parquet'):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    
+    total = 0
+    for _, size, path in sorted(entries, reverse=True):
+        total += size
+        if total > PARQUET_CACHE_BYTES and path != keep:
+            path.unlink(missing_ok=True)
+
+def _write_parquet_cache(df, path):
+    """Best-effort write of the parsed frame; a failed write only skips the cache"""
+    tmp = None
+    try:
+        PARQUET_CACHE_DIR.mkdir(mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=PARQUET_CACHE_DIR, suffix='.tmp')
+        os.close(fd)
+        df.to_parquet(tmp, engine='pyarrow', compression='zstd', index=False)
+        
+        # Only keep frames whose dtypes survive the round-trip unchanged
+        if _dtype_signature(pd.read_parquet(tmp, engine='pyarrow')) != _dtype_signature(df):
+            Path(tmp).unlink(missing_ok=True)
+            return
+        os.replace(tmp, path)
+        _evict_parquet_cache(keep=path)
+    except (OSError, ValueError, TypeError, pa.ArrowException):
+        if tmp is not None:
+            Path(tmp).unlink(missing_ok=True)
+
+@st.cache_data(show_spinner=False)
+def _load_bytes(name, payload):
+    """Parse uploaded file contents, cached across reruns and process restarts"""
+    path = _parquet_cache_path(payload)
+    if path.exists():
+        try:
+            return _read_parquet_cache(path)
+        except (OSError, ValueError, pa.ArrowException):
+            path.unlink(missing_ok=True)
+    
+    if name.endswith('.csv'):
+        df = _read_csv(payload)
+    elif name.endswith('.xlsx'):
+        if len(payload) > LARGE_FILE_BYTES:
+            df = _read_excel_chunked(payload)
+        else:
+            df = pd.read_excel(BytesIO(payload), engine='calamine')
+    else:
+        return None
+    
+    df = _downcast(df)
+    _write_parquet_cache(df, path)
+    return df
+
+def _column_buffers(series):
+    """Yield byte views of a column's contents for hashing"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        yield np.ascontiguousarray(series.cat.codes.to_numpy()).view(np.uint8)
+        yield str(list(dtype.categories)).encode()
+    elif isinstance(dtype, pd.ArrowDtype):
+        # Raw arrow buffers differ between equal arrays (optional validity
+        # bitmaps, bytes under null slots), so hash the null mask and the
+        # logical values instead
+        yield series.isna().to_numpy().view(np.uint8)
+        values = series.dropna().to_numpy()
+        if values.dtype == object:
+            yield pd.util.hash_array(values).view(np.uint8)
+        else:
+            yield np.ascontiguousarray(values).view(np.uint8)
+    elif isinstance(dtype, np.dtype) and dtype != object:
+        yield np.ascontiguousarray(series.to_numpy()).view(np.uint8)
+    else:
+        yield pd.util.hash_pandas_object(series, index=False).to_numpy().view(np.uint8)
+
+def _fast_df_hash(df):
+    """Hash shape, columns, dtypes and column buffers with blake2b"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(df.shape).encode())
+    h.update(str(list(df.columns)).encode())
+    h.update(str(df.dtypes.values).encode())
+    for _, series in df.items():
+        for buf in _column_buffers(series):
+            h.update(buf)
+    return h.digest()
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _fast_df_hash})
+def _describe_html(df):
+    """Styled summary statistics table, cached per DataFrame"""
+    return df.describe().style.background_gradient(cmap='Blues').to_html()
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _fast_df_hash})
+def _correlation(numeric_df):
+    """Pearson correlation matrix, cached per DataFrame"""
+    vals = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isnan(vals).any():
+        # Missing values need pandas' pairwise-complete handling
+        return numeric_df.corr()
+    
+    # Z.T @ Z is dispatched to a symmetric BLAS kernel; mirror the upper
+    # triangle so the result is exactly symmetric
+    std = vals.std(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (vals - vals.mean(axis=0)) / std
+        upper = np.triu(z.T @ z / len(z))
+    corr = upper + upper.T - np.diag(np.diag(upper))
+    # Constant columns stay NaN on the diagonal, as in np.corrcoef
+    diag = np.arange(len(std))
+    corr[diag, diag] = np.where(std > 0, 1.0, np.nan)
+    
+    return pd.DataFrame(corr, index=numeric_df.columns, columns=numeric_df.columns)
+
 def load_data(file):
     """Load data from uploaded file with error handling"""
     try:
-        if file.name.endswith('.csv'):
-            return pd.read_csv(file)
-        elif file.name.endswith('.xlsx'):
-            return pd.read_excel(file)
+        return _load_bytes(file.name, file.getvalue())
     except Exception as e:
         st.error(f"❌ Error loading file: {str(e)}")
         return None
 
-def clean_data(df):
+def split_columns(df):
+    """Split column names into numeric and categorical lists"""
+    numeric_cols = list(df.select_dtypes(include=np.number).columns)
+    categorical_cols = [col for col in df.columns if col not in numeric_cols]
+    return numeric_cols, categorical_cols
+
+def clean_data(df, numeric_cols):
     """Basic data cleaning operations"""
     with st.expander("🧹 Data Cleaning Options", expanded=False):
         col1, col2, col3 = st.columns(3)
@@ -177,9 +319,14 @@ def clean_data(df):
         
         with col2:
             if st.button("Fill Missing Values"):
-                numeric_cols = df.select_dtypes(include=np.number).columns
-                if not numeric_cols.empty:
-                    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
+                if numeric_cols:
+                    arr = df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+                    col_mean = np.nanmean(arr, axis=0)
+                    rows, cols = np.where(np.isnan(arr))
+                    arr[rows, cols] = np.take(col_mean, cols)
+                    filled = np.unique(cols)
+                    if len(filled):
+                        df[[numeric_cols[i] for i in filled]] = arr[:, filled]
                     st.success("Filled missing numeric values with mean")
                 else:
                     st.warning("No numeric columns found")
@@ -192,7 +339,7 @@ def clean_data(df):
     
     return df
 
-def show_data_stats(df):
+def show_data_stats(df, numeric_cols, categorical_cols):
     """Display data statistics and preview"""
     with st.expander("📊 Data Overview", expanded=True):
         st.subheader("Basic Information")
@@ -203,11 +350,11 @@ def show_data_stats(df):
             st.metric("Total Columns", len(df.columns))
         
         with col2:
-            st.metric("Numeric Columns", len(df.select_dtypes(include=np.number).columns))
-            st.metric("Categorical Columns", len(df.select_dtypes(exclude=np.number).columns))
+            st.metric("Numeric Columns", len(numeric_cols))
+            st.metric("Categorical Columns", len(categorical_cols))
         
         st.subheader("Summary Statistics")
-        st.dataframe(df.describe().style.background_gradient(cmap='Blues'))
+        st.markdown(_describe_html(df), unsafe_allow_html=True)
     
     with st.expander("🔍 Data Preview", expanded=False):
         st.dataframe(
@@ -218,78 +365,211 @@ def show_data_stats(df):
             })
         )
 
+def _is_temporal(series):
+    """True for numpy datetimes and arrow timestamp/date columns"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.ArrowDtype):
+        arrow_type = dtype.pyarrow_dtype
+        return pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type)
+    return pd.api.types.is_datetime64_any_dtype(series)
+
+def _temporal_to_int64(series):
+    """Epoch offsets of a temporal column as an int64 NumPy array"""
+    if isinstance(series.dtype, pd.ArrowDtype):
+        data = pa.array(series)
+        if pa.types.is_date(series.dtype.pyarrow_dtype):
+            data = pc.cast(data, pa.timestamp('s'))
+        return pc.cast(data, pa.int64()).to_numpy()
+    return series.astype('int64').to_numpy()
+
+def _downsample(df, x, y, n_out=2500):
+    """Reduce one series to n_out representative points using LTTB"""
+    series = df.dropna(subset=[x, y]).sort_values(x)
+    if len(series) <= n_out:
+        return series
+    
+    if _is_temporal(series[x]):
+        x_vals = _temporal_to_int64(series[x])
+    else:
+        x_vals = series[x].to_numpy(dtype=np.float64)
+    y_vals = series[y].to_numpy(dtype=np.float64)
+    
+    idx = LTTBDownsampler().downsample(x_vals, y_vals, n_out=n_out)
+    return series.iloc[idx]
+
+def downsample_for_plot(df, x, y, color=None, threshold=5000):
+    """Downsample large frames per series before building a line/scatter chart"""
+    if len(df) <= threshold:
+        return df
+    
+    x_ok = pd.api.types.is_numeric_dtype(df[x]) or _is_temporal(df[x])
+    y_ok = pd.api.types.is_numeric_dtype(df[y]) and not pd.api.types.is_bool_dtype(df[y])
+    if not x_ok or not y_ok or pd.api.types.is_bool_dtype(df[x]):
+        return df
+    
+    if color is None:
+        return _downsample(df, x, y)
+    
+    groups = df.groupby(color, observed=True, sort=False, dropna=False)
+    return pd.concat([_downsample(group, x, y) for _, group in groups])
+
+def histogram_frame(df, x, color=None, bins='auto'):
+    """Pre-bin a numeric column with shared edges, per color group if given"""
+    values = df[x].to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = np.isfinite(values)
+    edges = np.histogram_bin_edges(values[finite], bins=bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    
+    if color is None:
+        counts, _ = np.histogram(values[finite], bins=edges)
+        return pd.DataFrame({x: centers, "count": counts}), edges
+    
+    frames = []
+    for key, group in df[finite].groupby(color, observed=True, sort=False, dropna=False):
+        counts, _ = np.histogram(group[x].to_numpy(dtype=np.float64), bins=edges)
+        frames.append(pd.DataFrame({x: centers, "count": counts, color: key}))
+    return pd.concat(frames, ignore_index=True), edges
+
+def aggregate_for_bar(df, x, y, color=None):
+    """Sum y per category (and color) so bars ship one row per group, not per record"""
+    x_categorical = not (
+        pd.api.types.is_numeric_dtype(df[x])
+        or pd.api.types.is_datetime64_any_dtype(df[x])
+    ) or pd.api.types.is_bool_dtype(df[x])
+    y_numeric = pd.api.types.is_numeric_dtype(df[y]) and not pd.api.types.is_bool_dtype(df[y])
+    if not x_categorical or not y_numeric or y in (x, color):
+        return df
+    
+    keys = [x] if color is None else [x, color]
+    return df.groupby(keys, observed=True, sort=False)[y].sum().reset_index()
+
+def render_mode_for(df, threshold=10000):
+    """Use WebGL traces once a chart has too many points for SVG"""
+    return 'webgl' if len(df) > threshold else 'svg'
+
 def visualize_data(df):
     """Interactive data visualization"""
     st.subheader("📈 Data Visualization")
     
-    # Chart selection
+    # Chart selection; widgets inside the form only trigger a rebuild on submit
     col1, col2 = st.columns([1, 2])
     with col1:
-        chart_type = st.selectbox(
-            "Select Chart Type",
-            ["Bar", "Line", "Scatter", "Histogram", "Box", "Pie", "Violin"],
-            key="chart_type"
-        )
-        
-        x_axis = st.selectbox("X-axis", df.columns, key="x_axis")
-        y_axis = st.selectbox(
-            "Y-axis", 
-            df.columns, 
-            disabled=chart_type in ["Histogram", "Pie"],
-            key="y_axis"
-        )
-        
-        color_by = st.selectbox(
-            "Color By",
-            ["None"] + list(df.columns),
-            key="color_by"
-        )
+        with st.form("viz"):
+            chart_type = st.selectbox(
+                "Select Chart Type",
+                ["Bar", "Line", "Scatter", "Histogram", "Box", "Pie", "Violin"],
+                key="chart_type"
+            )
+            
+            x_axis = st.selectbox("X-axis", df.columns, key="x_axis")
+            y_axis = st.selectbox(
+                "Y-axis", 
+                df.columns, 
+                disabled=chart_type in ["Histogram", "Pie"],
+                key="y_axis"
+            )
+            
+            color_by = st.selectbox(
+                "Color By",
+                ["None"] + list(df.columns),
+                key="color_by"
+            )
+            
+            hist_bins = st.slider(
+                "Histogram Bins",
+                0, 200, 0,
+                help="0 picks the bin count automatically",
+                key="hist_bins"
+            )
+            
+            submitted = st.form_submit_button("Plot")
+    
+    color = None if color_by == "None" else color_by
+    # Coloring by the x column itself creates one trace per x value
+    series_color = None if color == x_axis else color
+    
+    # Reuse the last figure until the form is submitted or the data changes
+    data_key = _fast_df_hash(df)
+    last = st.session_state.get("viz_figure")
+    if not submitted and last is not None and last[0] == data_key:
+        with col2:
+            st.plotly_chart(last[1], use_container_width=True)
+        return
     
     # Generate chart
     try:
         if chart_type == "Bar":
             fig = px.bar(
-                df, 
+                aggregate_for_bar(df, x_axis, y_axis, series_color), 
                 x=x_axis, 
                 y=y_axis, 
-                color=None if color_by == "None" else color_by,
+                color=series_color,
                 template="plotly_dark"
             )
         elif chart_type == "Line":
+            plot_df = downsample_for_plot(df, x_axis, y_axis, series_color)
             fig = px.line(
-                df, 
+                plot_df, 
                 x=x_axis, 
                 y=y_axis, 
-                color=None if color_by == "None" else color_by,
+                color=series_color,
+                render_mode=render_mode_for(plot_df),
                 template="plotly_dark"
             )
         elif chart_type == "Scatter":
+            plot_df = downsample_for_plot(df, x_axis, y_axis, color)
             fig = px.scatter(
-                df, 
+                plot_df, 
                 x=x_axis, 
                 y=y_axis, 
-                color=None if color_by == "None" else color_by,
+                color=color,
+                render_mode=render_mode_for(plot_df),
                 template="plotly_dark"
             )
         elif chart_type == "Histogram":
-            fig = px.histogram(
-                df, 
-                x=x_axis, 
-                color=None if color_by == "None" else color_by,
-                template="plotly_dark"
+            x_numeric = (
+                pd.api.types.is_numeric_dtype(df[x_axis])
+                and not pd.api.types.is_bool_dtype(df[x_axis])
             )
+            if x_numeric:
+                # Bin server-side so the payload is one bar per bin, not one value per row
+                hist_df, edges = histogram_frame(
+                    df, x_axis, series_color, bins=hist_bins or 'auto'
+                )
+                fig = px.bar(
+                    hist_df, 
+                    x=x_axis, 
+                    y="count", 
+                    color=series_color,
+                    template="plotly_dark"
+                )
+                fig.update_traces(width=edges[1] - edges[0])
+                fig.update_layout(bargap=0)
+            else:
+                fig = px.histogram(
+                    df, 
+                    x=x_axis, 
+                    color=color,
+                    template="plotly_dark"
+                )
         elif chart_type == "Box":
             fig = px.box(
                 df, 
                 x=x_axis, 
                 y=y_axis, 
-                color=None if color_by == "None" else color_by,
+                color=color,
                 template="plotly_dark"
             )
         elif chart_type == "Pie":
+            counts = df[x_axis].value_counts()
+            names, values = list(counts.index[:50]), list(counts.values[:50])  # cap cardinality
+            if len(counts) > 50:
+                # Keep the remainder as one slice so shares stay relative to all rows
+                names.append("Other")
+                values.append(counts.values[50:].sum())
             fig = px.pie(
-                df, 
-                names=x_axis, 
+                values=values, 
+                names=names, 
                 template="plotly_dark"
             )
         elif chart_type == "Violin":
@@ -297,7 +577,7 @@ def visualize_data(df):
                 df,
                 x=x_axis,
                 y=y_axis,
-                color=None if color_by == "None" else color_by,
+                color=color,
                 template="plotly_dark"
             )
         
@@ -307,38 +587,44 @@ def visualize_data(df):
             'font': {'color': 'white'}
         })
         
+        st.session_state["viz_figure"] = (data_key, fig)
         with col2:
             st.plotly_chart(fig, use_container_width=True)
     
     except Exception as e:
         st.error(f"❌ Error creating visualization: {str(e)}")
 
-def show_correlations(df):
+def show_correlations(df, numeric_cols):
     """Display correlation matrix"""
     st.subheader("🧩 Correlation Matrix")
     
-    numeric_df = df.select_dtypes(include=np.number)
-    if len(numeric_df.columns) > 1:
+    if len(numeric_cols) > 1:
         try:
-            corr = numeric_df.corr()
-            
-            plt.figure(figsize=(10, 8), facecolor='#1e2229')
-            sns.heatmap(
-                corr, 
-                annot=True, 
-                cmap="Blues", 
-                annot_kws={"color": "white"},
-                linewidths=0.5
+            corr = _correlation(df[numeric_cols])
+            fig = px.imshow(
+                corr,
+                color_continuous_scale="Blues",
+                text_auto=".2f",
+                aspect="auto",
+                template="plotly_dark"
             )
-            plt.xticks(color='white', rotation=45)
-            plt.yticks(color='white')
-            st.pyplot(plt)
-            plt.clf()
+            fig.update_layout({
+                'plot_bgcolor': 'rgba(30, 34, 41, 1)',
+                'paper_bgcolor': 'rgba(30, 34, 41, 1)',
+                'font': {'color': 'white'}
+            })
+            st.plotly_chart(fig, use_container_width=True)
         except Exception as e:
             st.error(f"❌ Error creating correlation matrix: {str(e)}")
     else:
         st.warning("⚠️ Not enough numeric columns for correlation analysis")
 
+def _to_csv_bytes(df):
+    """Serialize a DataFrame straight to UTF-8 CSV bytes"""
+    buf = BytesIO()
+    df.to_csv(buf, index=False, encoding='utf-8')
+    return buf.getvalue()
+
 def export_data(df):
     """Data export functionality"""
     st.subheader("💾 Export Data")
@@ -359,7 +645,7 @@ def export_data(df):
     
     with col2:
         if format_type == "CSV":
-            data = df.to_csv(index=False).encode('utf-8')
+            data = _to_csv_bytes(df)
             st.download_button(
                 "Download CSV",
                 data=data,
@@ -370,7 +656,7 @@ def export_data(df):
             )
         else:
             output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
                 df.to_excel(writer, index=False, sheet_name="Data")
             st.download_button(
                 "Download Excel",
@@ -405,10 +691,11 @@ def main():
                 st.success(f"👋 Welcome, {user_name}! Let's analyze your growth data.")
             
             # Data processing pipeline
-            df = clean_data(df)
-            show_data_stats(df)
+            numeric_cols, categorical_cols = split_columns(df)
+            df = clean_data(df, numeric_cols)
+            show_data_stats(df, numeric_cols, categorical_cols)
             visualize_data(df)
-            show_correlations(df)
+            show_correlations(df, numeric_cols)
             export_data(df)
             
             # Celebration